@@ -1,65 +1,175 @@
 #!/usr/bin/env python3
 
 import csv
+import math
+import mmap
 import os
 import sys
 import re
 import time
-from typing import List, Tuple, Set
+from typing import Dict, List, Tuple, Set
 from datetime import datetime
 from pathlib import Path
 import argparse
-import tldextract
-import html.parser
-from difflib import SequenceMatcher
-
-class EmailHTMLParser(html.parser.HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.emails = set()
-        self.email_pattern = re.compile(r"""(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])""", re.IGNORECASE)
-        self.in_pre = False
-        self.current_pre_content = []
-
-    def handle_starttag(self, tag, attrs):
-        # Check all attributes for email addresses
-        for attr, value in attrs:
-            if value:
-                found_emails = self.email_pattern.findall(value)
-                self.emails.update(found_emails)
-        
-        # Track when we enter a pre tag - debug use
-        if tag == 'pre':
-            self.in_pre = True
-
-    def handle_endtag(self, tag):
-        # When leaving a pre tag, process its content
-        if tag == 'pre':
-            self.in_pre = False
-            full_content = ''.join(self.current_pre_content)
-            found_emails = self.email_pattern.findall(full_content)
-            self.emails.update(found_emails)
-            self.current_pre_content = []
-
-    def handle_data(self, data):
-        # If we're in a pre tag, gather content
-        if self.in_pre:
-            self.current_pre_content.append(data)
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from array import array
+from collections import Counter
+
+EMAIL_PATTERN = r"""(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])"""
+
+# Compiled once and run over raw file contents without decoding them
+EMAIL_BYTES_RE = re.compile(EMAIL_PATTERN.encode(), re.IGNORECASE)
+# Consecutive special characters in the local part (... _+_++_)
+SPECIAL_CHARS_RE = re.compile(r'[._%+-]{2,}')
+
+def load_tlds() -> Set[str]:
+    """Load the top-level domain list shipped next to this script."""
+    with open(Path(__file__).with_name('tlds.txt'), 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith('#')}
+
+TLDS = load_tlds()
+
+@lru_cache(maxsize=None)
+def domain_malformation_probability(domain: str) -> float:
+    """Score the domain checks; cached because most emails share a few domains."""
+    probability = 0.0
+    
+    # Check TLD
+    tld = domain.rpartition('.')[2].lower()
+    if tld not in TLDS:
+        probability += 0.4
+    elif len(tld) > 6:  # Unusual TLD length
+        probability += 0.2
         
-        # checking for emails
-        found_emails = self.email_pattern.findall(data)
-        self.emails.update(found_emails)
+    # Check for unusual number of subdomains (by 'dot' count)
+    if len(domain.split('.')) > 4:
+        probability += 0.1
+    
+    return probability
+
+def find_emails(content) -> List[bytes]:
+    """Return every email match in content, only running the regex on lines with an '@'.
+
+    A match can start right where the previous one ended:
+
+    >>> find_emails(b'alice@x.com/bob@y.com mailto:alice@x.com?cc=bob@y.com')
+    [b'alice@x.com', b'/bob@y.com', b'alice@x.com', b'?cc=bob@y.com']
+    >>> find_emails(b'a@b.com+c@d.com a@b.com_c@d.com')
+    [b'a@b.com', b'+c@d.com', b'a@b.com', b'_c@d.com']
+    """
+    # No character class in EMAIL_PATTERN allows a line break, so a match never
+    # spans lines and lines without an '@' are skipped with a plain find().
+    # Lines with an '@' less than 256 bytes apart are scanned together, since a short
+    # regex pass is cheaper than another round trip through this loop.
+    emails = []
+    at = content.find(b'@')
+    while at != -1:
+        region_start = content.rfind(b'\n', 0, at) + 1
+        while True:
+            region_end = content.find(b'\n', at)
+            if region_end == -1:
+                region_end = len(content)
+            at = content.find(b'@', region_end)
+            if at == -1 or at - region_end >= 256:
+                break
+        emails.extend(EMAIL_BYTES_RE.findall(content, region_start, region_end))
+    return emails
+
+def scan_file(file_path: Path) -> Dict[str, int]:
+    """Return how often each email appears in a file, in the order they first appear."""
+    with open(file_path, 'rb') as f:
+        # mmap can't map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        # Scan the file in place; only the matches are copied out and decoded.
+        # The pattern is ASCII-only, so matches always decode as ASCII.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # The file is read front to back once, so let the kernel read ahead
+            # and drop pages behind the scan (not available on Windows)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                content.madvise(mmap.MADV_SEQUENTIAL)
+            counts = Counter(find_emails(content))
+            return {email.decode('ascii'): count for email, count in counts.items()}
+
+def read_csv_emails(file_path: Path) -> Dict[str, int]:
+    """Return the emails found in a CSV file with how often each occurs."""
+    try:
+        # Delimiters can't be part of an email, so the raw bytes are scanned
+        # directly instead of splitting every row into fields
+        return scan_file(file_path)
+    except Exception as e:
+        print(f"Error processing CSV file {file_path}: {str(e)}")
+        return {}
+
+def read_html_emails(file_path: Path) -> Dict[str, int]:
+    """Return the unique emails found in an HTML file, each counted once."""
+    try:
+        # Emails look the same in tags, attributes and text, so the raw bytes
+        # are scanned directly instead of going through an HTML parser
+        return dict.fromkeys(scan_file(file_path), 1)
+    except Exception as e:
+        print(f"Error processing HTML file {file_path}: {str(e)}")
+        return {}
+
+def read_file_emails(file_path: Path) -> Dict[str, int]:
+    """Return the emails found in a file with their counts. Module-level so worker processes can run it."""
+    try:
+        if file_path.suffix.lower() in ['.csv']:
+            return read_csv_emails(file_path)
+        elif file_path.suffix.lower() in ['.html', '.htm']:
+            return read_html_emails(file_path)
+        else:
+            print(f"Unsupported file type: {file_path}")
+    except Exception as e:
+        print(f"Error processing file {file_path}: {str(e)}")
+    return {}
+
+def find_input_files(root: Path) -> Tuple[List[Path], List[Path], List[Path], Set[str]]:
+    """Walk root once, returning its CSV, HTML and HTM files and the folders holding them."""
+    csv_files, html_files, htm_files = [], [], []
+    folders = set()
+    # One os.walk pass instead of a separate rglob walk per pattern
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            name = file_name.lower()
+            if name.endswith('.csv'):
+                csv_files.append(Path(dir_path, file_name))
+            elif name.endswith('.html'):
+                html_files.append(Path(dir_path, file_name))
+            elif name.endswith('.htm'):
+                htm_files.append(Path(dir_path, file_name))
+            else:
+                continue
+            folders.add(dir_path)
+    return csv_files, html_files, htm_files, folders
 
 class EmailParser:
-    def __init__(self, similarity_threshold: float = 90.0, exclude_list: str = None):
-        self.unique_emails = set()
-        self.batch_size = 20
+    def __init__(self, similarity_threshold: float = 90.0, exclude_list: str = None,
+                 similarity_algo: str = 'indel'):
+        # Every unique email is stored once, lowercased; its position is its ID
+        self.email_ids = {}
+        self.lower_emails = []
+        self.batch_size = 1000
         self.current_batch = []
         self.output_file = None
-        self.email_pattern = re.compile(r"""(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*")@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?|\[(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?|[a-z0-9-]*[a-z0-9]:(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])""")
-        self.all_emails = []
+        self.output_handle = None
+        self.writer = None
+        self.ngram_index = {}
         self.similarity_threshold = similarity_threshold
+        if similarity_algo == 'lev':
+            # Bit-parallel Levenshtein; scores run 0-1, so cutoffs and results are scaled
+            self.scorer = Levenshtein.normalized_similarity
+            self.score_scale = 100
+        else:
+            # 'indel' (or its old name 'ro'): normalized InDel distance, i.e. the
+            # matching-characters ratio 2*M/T over the longest common subsequence
+            self.scorer = fuzz.ratio
+            self.score_scale = 1
         self.processed_count = 0
+        self.last_progress_time = 0.0
         self.excluded_emails = set()
         
         if exclude_list:
@@ -80,185 +190,197 @@ class EmailParser:
         if not self.current_batch:
             return
     
-        with open(self.output_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            for email in self.current_batch:
-                # Skip if email is in exclude list
-                if email.lower() in self.excluded_emails:
-                    self.processed_count += 1
-                    continue
-                    
-                similar_email, similarity = self.find_similar_email(email)
-                writer.writerow([
-                    email,
-                    self.calculate_malformation_probability(email),
-                    similar_email if similarity >= self.similarity_threshold else "",
-                    f"{similarity:.2f}" if similarity >= self.similarity_threshold else "",
-                    str(source_file)
-                ])
-                self.all_emails.append(email)
+        rows = []
+        source = str(source_file)
+        for email, email_lower in self.current_batch:
+            # Skip if email is in exclude list
+            if email_lower in self.excluded_emails:
                 self.processed_count += 1
-                print(f"\rEmails processed: {self.processed_count} | Unique Emails: {len(self.unique_emails)}", end='', flush=True)
+                continue
+                
+            similar_email, similarity = self.find_similar_email(email_lower)
+            rows.append([
+                email,
+                self.calculate_malformation_probability(email),
+                similar_email,
+                f"{similarity:.2f}" if similar_email else "",
+                source
+            ])
+            self.processed_count += 1
+            self.print_progress()
+        
+        self.print_progress(force=True)
+        self.writer.writerows(rows)
+        # Flush once per batch so partial results survive an interrupted run
+        self.output_handle.flush()
         self.current_batch = []
 
+    def print_progress(self, force: bool = False):
+        """Update the progress line, at most 4 times a second unless forced."""
+        # Writing to the terminal for every email is slower than processing it
+        now = time.monotonic()
+        if force or now - self.last_progress_time >= 0.25:
+            self.last_progress_time = now
+            print(f"\rEmails processed: {self.processed_count} | Unique Emails: {len(self.lower_emails)}", end='', flush=True)
+
     def find_similar_email(self, email: str) -> Tuple[str, float]:
-        highest_similarity = 0
-        most_similar_email = ""
+        """Return the closest earlier or same-batch match for a lowercase email."""
+        email_id = self.email_ids[email]
+        
+        # Compare with every email seen so far (processed and current batch)
+        # that shares enough 3-grams
+        candidates = [self.lower_emails[candidate_id] for candidate_id in self.find_candidates(email)
+                      if candidate_id != email_id]
+        # extractOne keeps the first best match and uses the cutoff to skip pairs early.
+        # processor=None scores the emails as-is; rapidfuzz 2.x strips '@' and '.' by default.
+        match = process.extractOne(email, candidates, scorer=self.scorer, processor=None,
+                                   score_cutoff=self.similarity_threshold / self.score_scale)
+        if match is None:
+            return "", 0
+        return match[0], match[1] * self.score_scale
+
+    def get_ngrams(self, email: str) -> Set[str]:
+        return {email[i:i + 3] for i in range(len(email) - 2)}
+
+    def add_email(self, email: str, source_file: Path, count: int = 1):
+        """Queue an email for output the first time it is seen."""
+        # Count every occurrence as found before checking
+        self.processed_count += count
+        email_lower = email.lower()
+        email_id = self.email_ids.setdefault(email_lower, len(self.lower_emails))
+        if email_id < len(self.lower_emails):
+            return
+        
+        self.lower_emails.append(email_lower)
+        if email_lower not in self.excluded_emails:
+            self.index_email(email_id)
+        # Lowercased once here; the batch carries both forms from now on
+        self.current_batch.append((email, email_lower))
         
-        # Compare with all previously processed emails
-        for existing_email in self.all_emails:
-            if existing_email != email:
-                similarity = self.calculate_similarity(email, existing_email)
-                if similarity > highest_similarity and similarity >= self.similarity_threshold:
-                    highest_similarity = similarity
-                    most_similar_email = existing_email
+        if len(self.current_batch) >= self.batch_size:
+            self.process_batch(source_file)
+
+    def index_email(self, email_id: int):
+        """Add an email to the similarity pool and the 3-gram index."""
+        # Each posting list is a packed array of 4-byte IDs rather than a set of
+        # int objects; IDs are only ever appended, in increasing order
+        for ngram in self.get_ngrams(self.lower_emails[email_id]):
+            postings = self.ngram_index.get(ngram)
+            if postings is None:
+                postings = self.ngram_index[ngram] = array('I')
+            postings.append(email_id)
+
+    def min_shared_ngrams(self, total_length: int) -> float:
+        # Two emails at the threshold have M >= T*(len1+len2)/2 matching characters,
+        # split into at most D+1 blocks (D = unmatched characters), and every block
+        # keeps all but 2 of its 3-grams intact
+        threshold = self.similarity_threshold / 100
+        return threshold * total_length / 2 - 2 * ((1 - threshold) * total_length + 1)
+
+    def find_candidates(self, email: str) -> List[int]:
+        """Return IDs of indexed emails that could reach the similarity threshold."""
+        threshold = self.similarity_threshold / 100
+        shortest_match = len(email) * threshold / (2 - threshold)
+        # The bound grows with the other email's length, so the shortest possible
+        # match gives one cutoff that holds for every candidate
+        min_shared = math.ceil(self.min_shared_ngrams(len(email) + shortest_match))
+        # Repeated 3-grams in the email only appear once in its set
+        ngrams = self.get_ngrams(email)
+        min_shared -= len(email) - 2 - len(ngrams)
+        
+        # Low thresholds or very short emails can't be pruned by shared 3-grams
+        if min_shared <= 0:
+            return [email_id for email_id, existing_email in enumerate(self.lower_emails)
+                    if existing_email not in self.excluded_emails]
         
-        # Check current batch
-        for batch_email in self.current_batch:
-            if batch_email != email:
-                similarity = self.calculate_similarity(email, batch_email)
-                if similarity > highest_similarity and similarity >= self.similarity_threshold:
-                    highest_similarity = similarity
-                    most_similar_email = batch_email
+        # A candidate sharing min_shared of the n 3-grams must share at least one
+        # of any n - min_shared + 1 of them, so only the rarest ones are looked up.
+        # The scorer does the exact check on whatever comes back.
+        ngrams = sorted(ngrams, key=lambda ngram: len(self.ngram_index.get(ngram, ())))
+        candidates = set()
+        for ngram in ngrams[:len(ngrams) - min_shared + 1]:
+            candidates.update(self.ngram_index.get(ngram, ()))
         
-        return most_similar_email, highest_similarity
+        # Sorted so ties resolve to the earliest email, same as a full scan
+        return sorted(candidates)
 
     def process_path(self, path: str):
         self.setup_output_file()
-        path_obj = Path(path)
+        try:
+            path_obj = Path(path)
     
-        print("\nStarting email parsing process...")
-        print("Progress will update after each batch")
-        print("-" * 50)
+            print("\nStarting email parsing process...")
+            print("Progress will update after each batch")
+            print("-" * 50)
     
-        if path_obj.is_file():
-            print(f"Processing: {path_obj}")
-            self.parse_file(path_obj)
-            if self.current_batch:
-                self.process_batch(path_obj)
-        elif path_obj.is_dir():
-            # Count files by type
-            csv_files = list(path_obj.rglob('*.csv'))
-            html_files = list(path_obj.rglob('*.html'))
-            htm_files = list(path_obj.rglob('*.htm'))
-            
-            # Count subfolders
-            folders = set()
-            for pattern in ['*.csv', '*.html', '*.htm']:
-                for file_path in path_obj.rglob(pattern):
-                    folders.add(str(file_path.parent))
-            folder_count = len(folders) - 1 if len(folders) > 0 else 0
-            
-            total_html = len(html_files) + len(htm_files)
-            print(f"Found {len(csv_files) + total_html} files to process:")
-            print(f" {len(csv_files)} CSV files")
-            print(f" {total_html} HTML files")
-            print(f" {folder_count} folders")
-            print("")
-            
-            # Process CSV files
-            for file_path in csv_files:
-                self.parse_file(file_path)
+            if path_obj.is_file():
+                print(f"Processing: {path_obj}")
+                self.parse_file(path_obj)
                 if self.current_batch:
-                    self.process_batch(file_path)
+                    self.process_batch(path_obj)
+            elif path_obj.is_dir():
+                # Count files by type and subfolders
+                csv_files, html_files, htm_files, folders = find_input_files(path_obj)
+                folder_count = len(folders) - 1 if len(folders) > 0 else 0
             
-            # Process HTML files
-            for file_pattern in ['*.html', '*.htm']:
-                for file_path in path_obj.rglob(file_pattern):
-                    self.parse_file(file_path)
-                    if self.current_batch:
-                        self.process_batch(file_path)
+                total_html = len(html_files) + len(htm_files)
+                print(f"Found {len(csv_files) + total_html} files to process:")
+                print(f" {len(csv_files)} CSV files")
+                print(f" {total_html} HTML files")
+                print(f" {folder_count} folders")
+                print("")
             
-            # Final output
-            print("\n" + "-" * 50)
-            print(f"Processing complete. Found {len(self.unique_emails)} unique email addresses.")
-            print(f"Results saved to: {self.output_file}")
-
-    def parse_file(self, file_path: Path):
-        try:
-            if file_path.suffix.lower() in ['.csv']:
-                self.parse_csv_file(file_path)
-            elif file_path.suffix.lower() in ['.html', '.htm']:
-                self.parse_html_file(file_path)
-            else:
-                print(f"Unsupported file type: {file_path}")
-        except Exception as e:
-            print(f"Error processing file {file_path}: {str(e)}")
-
-    def parse_csv_file(self, file_path: Path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    for field in row:
-                        found_emails = self.email_pattern.findall(field)
-                        for email in found_emails:
-                            # Count every email as found before checking
-                            self.processed_count += 1
-                            if email.lower() not in self.unique_emails:
-                                self.unique_emails.add(email.lower())
-                                self.current_batch.append(email)
-                                
-                                if len(self.current_batch) >= self.batch_size:
-                                    self.process_batch(file_path)
-        except Exception as e:
-            print(f"Error processing CSV file {file_path}: {str(e)}")
+                # Files are read in parallel worker processes; results come back in
+                # order and similarity checks and output stay in this process
+                all_files = csv_files + html_files + htm_files
+                with ProcessPoolExecutor() as executor:
+                    results = executor.map(read_file_emails, all_files, chunksize=16)
+                    for file_path, emails in zip(all_files, results):
+                        self.parse_file(file_path, emails)
+                        if self.current_batch:
+                            self.process_batch(file_path)
+            
+                # Final output
+                print("\n" + "-" * 50)
+                print(f"Processing complete. Found {len(self.lower_emails)} unique email addresses.")
+                print(f"Results saved to: {self.output_file}")
+        finally:
+            self.close_output_file()
 
-    def parse_html_file(self, file_path: Path):
-        try:
-            parser = EmailHTMLParser()
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                parser.feed(content)
-                
-            for email in parser.emails:
-                # Count every email as found before checking
-                self.processed_count += 1
-                # Only add to batch if unique
-                if email.lower() not in self.unique_emails:
-                    self.unique_emails.add(email.lower())
-                    self.current_batch.append(email)
-                    
-                    if len(self.current_batch) >= self.batch_size:
-                        self.process_batch(file_path)
-        except Exception as e:
-            print(f"Error processing HTML file {file_path}: {str(e)}")
+    def parse_file(self, file_path: Path, emails: Dict[str, int] = None):
+        """Queue the emails found in a file; pass emails if it was already read."""
+        if emails is None:
+            emails = read_file_emails(file_path)
+        for email, count in emails.items():
+            self.add_email(email, file_path, count)
 
     def setup_output_file(self):
         """Setup the output CSV file with timestamp."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_file = Path(f"EMAIL_ADDRESSES_{timestamp}.csv")
-        with open(self.output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Email Address', 'Malformation Probability', 
-                           'Similar Email', 'Similarity Percentage', 'Source File'])
+        # Kept open for the whole run; batches are written through a 1 MB buffer
+        self.output_handle = open(self.output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+        self.writer = csv.writer(self.output_handle)
+        self.writer.writerow(['Email Address', 'Malformation Probability', 
+                              'Similar Email', 'Similarity Percentage', 'Source File'])
 
- 
-    def calculate_similarity(self, email1: str, email2: str) -> float:
-        return SequenceMatcher(None, email1.lower(), email2.lower()).ratio() * 100
+    def close_output_file(self):
+        if self.output_handle:
+            self.output_handle.close()
+            self.output_handle = None
+            self.writer = None
 
     def calculate_malformation_probability(self, email: str) -> float:
-        probability = 0.0
-        
-        # Check TLD
-        ext = tldextract.extract(email)
-        if not ext.suffix:
-            probability += 0.4
-        elif len(ext.suffix) > 6:  # Unusual TLD length
-            probability += 0.2
-            
-        # Check for unusual number of subdomains (by 'dot' count)
-        domain_parts = email.split('@')[1].split('.')
-        if len(domain_parts) > 4:
-            probability += 0.1
+        local_part, _, domain = email.rpartition('@')
+        # TLD and subdomain checks
+        probability = domain_malformation_probability(domain)
             
         # Check for unusual character count for "addressee"
-        local_part = email.split('@')[0]
         if len(local_part) > 64:
             probability += 0.1
         
         # Check for consecutive special characters (... _+_++_)
-        if re.search(r'[._%+-]{2,}', local_part):
+        if SPECIAL_CHARS_RE.search(local_part):
             probability += 0.1
             
         # probability cannot exceed 1.0
@@ -272,12 +394,20 @@ def main():
                       help='Similarity threshold percentage (default: 90.0)')
     parser.add_argument('-e', '--exclude', type=str,
                       help='Path to CSV file containing emails to exclude')
+    parser.add_argument('-a', '--similarity-algo', choices=['indel', 'lev', 'ro'], default='indel',
+                      help='Similarity scoring: indel (InDel ratio, matching characters over the '
+                           'longest common subsequence) or lev (normalized Levenshtein, faster on '
+                           'short strings); ro is an alias for indel (default: indel)')
     
     args = parser.parse_args()
+    # The 3-gram bound in find_candidates only holds for percentages
+    if not 0 <= args.similarity <= 100:
+        parser.error('--similarity must be between 0 and 100')
     
     email_parser = EmailParser(
         similarity_threshold=args.similarity,
-        exclude_list=args.exclude
+        exclude_list=args.exclude,
+        similarity_algo=args.similarity_algo
     )
     email_parser.process_path(args.path)
 